@@ -20,12 +20,14 @@ Date: 2025-01-01
 """
 
 import os
+import re
 import sys
 import argparse
 import pandas as pd
 import numpy as np
 import sqlite3
 import json
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 import warnings
@@ -35,36 +37,228 @@ warnings.filterwarnings('ignore')
 try:
     from sklearn.model_selection import train_test_split, TimeSeriesSplit
     from sklearn.preprocessing import StandardScaler, MinMaxScaler
-    from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+    from sklearn.ensemble import HistGradientBoostingRegressor, GradientBoostingRegressor
     from sklearn.linear_model import LinearRegression, Ridge
     from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
     from sklearn.feature_selection import SelectKBest, f_regression
-    import matplotlib.pyplot as plt
-    import seaborn as sns
+    from joblib import Parallel, delayed
     ML_AVAILABLE = True
 except ImportError as e:
     print(f"Warning: Some ML libraries not available: {e}")
     print("Installing required packages...")
-    os.system("pip install scikit-learn matplotlib seaborn pandas numpy")
+    os.system("pip install scikit-learn pandas numpy")
     try:
         from sklearn.model_selection import train_test_split, TimeSeriesSplit
         from sklearn.preprocessing import StandardScaler, MinMaxScaler
-        from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+        from sklearn.ensemble import HistGradientBoostingRegressor, GradientBoostingRegressor
         from sklearn.linear_model import LinearRegression, Ridge
         from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
         from sklearn.feature_selection import SelectKBest, f_regression
-        import matplotlib.pyplot as plt
-        import seaborn as sns
+        from joblib import Parallel, delayed
         ML_AVAILABLE = True
     except ImportError:
         ML_AVAILABLE = False
 
+# Arrow-backed CSV parsing and Parquet caching (optional, falls back to the default C parser)
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# LightGBM histogram boosting (optional, falls back to sklearn Gradient Boosting)
+try:
+    from lightgbm import LGBMRegressor
+    LIGHTGBM_AVAILABLE = True
+except ImportError:
+    LIGHTGBM_AVAILABLE = False
+
+# JIT-compiled feature kernel (optional, falls back to pandas column arithmetic)
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Only the columns the analysis uses are read; close_time is part of the
+# documented format but never used, so it is pruned at read time
+REQUIRED_COLUMNS = ['date', 'open_time', 'open_price', 'close_price', 'asset_volume', 'number_of_trades']
+
+
+def _ensure_parquet_cache(file_path):
+    """
+    Convert a CSV file to a Parquet cache next to it, if missing or stale
+    
+    Args:
+        file_path (Path): Source CSV file
+        
+    Returns:
+        Path: Path of the up-to-date Parquet file
+    """
+    parquet_path = file_path.with_suffix('.parquet')
+    if parquet_path.exists() and parquet_path.stat().st_mtime >= file_path.stat().st_mtime:
+        return parquet_path
+    
+    # Keep date/time columns as strings, matching the CSV read path
+    convert_options = pa_csv.ConvertOptions(
+        column_types={'date': pa.string(), 'open_time': pa.string(), 'close_time': pa.string()}
+    )
+    table = pa_csv.read_csv(file_path, convert_options=convert_options)
+    
+    # Write to a temporary file first so an interrupted run never leaves a partial cache
+    tmp_path = parquet_path.with_name(parquet_path.name + '.tmp')
+    pq.write_table(table, tmp_path, compression='zstd')
+    os.replace(tmp_path, parquet_path)
+    return parquet_path
+
+
+def decode_feature_importance(feature_names_json, feature_importances):
+    """
+    Decode feature importances stored in the ml_model_results table
+    
+    Args:
+        feature_names_json (str): JSON list of feature names
+        feature_importances (bytes): Packed float32 importance values
+        
+    Returns:
+        list: (feature, importance) tuples, or None if nothing was stored
+    """
+    if feature_names_json is None or feature_importances is None:
+        return None
+    names = json.loads(feature_names_json)
+    values = np.frombuffer(feature_importances, dtype=np.float32)
+    return list(zip(names, values.tolist()))
+
+
+def _summarize_frame(df):
+    """
+    Compute the per-file summary statistics in a single aggregation
+    
+    Args:
+        df (pd.DataFrame): Raw data for one file
+        
+    Returns:
+        dict: Date range, price range, average volume and average trades
+    """
+    agg = df.agg({
+        'date': ['min', 'max'],
+        'open_price': 'min',
+        'close_price': 'max',
+        'asset_volume': 'mean',
+        'number_of_trades': 'mean'
+    })
+    return {
+        'date_min': agg.at['min', 'date'],
+        'date_max': agg.at['max', 'date'],
+        'price_min': agg.at['min', 'open_price'],
+        'price_max': agg.at['max', 'close_price'],
+        'avg_volume': agg.at['mean', 'asset_volume'],
+        'avg_trades': agg.at['mean', 'number_of_trades']
+    }
+
+
+def _load_one(file_path):
+    """
+    Read a single CSV file (through its Parquet cache when available) and collect its metadata
+    
+    Defined at module level so it can be dispatched to worker processes.
+    A missing required column makes the read raise ValueError/KeyError.
+    
+    Args:
+        file_path (Path): CSV file to read
+        
+    Returns:
+        tuple: (filename, metadata, summary statistics, dataframe)
+    """
+    parquet_path = None
+    if PYARROW_AVAILABLE:
+        try:
+            parquet_path = _ensure_parquet_cache(file_path)
+        except OSError:
+            # Read-only data directory: fall back to reading the CSV directly
+            parquet_path = None
+    
+    if parquet_path is not None:
+        # Column pruning happens in the Parquet reader, before any data is materialized
+        df_full = pd.read_parquet(parquet_path, columns=REQUIRED_COLUMNS, dtype_backend='pyarrow')
+    else:
+        # Keep date/time columns as strings; Arrow would otherwise infer date32/time32
+        read_kwargs = {'usecols': REQUIRED_COLUMNS}
+        if PYARROW_AVAILABLE:
+            read_kwargs.update(
+                engine='pyarrow',
+                dtype_backend='pyarrow',
+                dtype={'date': 'string[pyarrow]', 'open_time': 'string[pyarrow]'}
+            )
+        df_full = pd.read_csv(file_path, **read_kwargs)
+    stats = _summarize_frame(df_full)
+    metadata = {
+        'path': str(file_path),
+        'name': file_path.stem,
+        'records': len(df_full),
+        'columns': list(df_full.columns),
+        'date_range': (stats['date_min'], stats['date_max']),
+        'price_range': (stats['price_min'], stats['price_max']),
+        'size_mb': file_path.stat().st_size / (1024 * 1024)
+    }
+    
+    return file_path.name, metadata, stats, df_full
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _engineer_kernel(op, cp, av, nt, out_chg, out_chg_pct, out_vol, out_vpt, out_vpr):
+        """Compute the elementwise price/volume features in a single pass"""
+        for i in prange(op.shape[0]):
+            chg = cp[i] - op[i]
+            out_chg[i] = chg
+            out_chg_pct[i] = chg / op[i] * 100.0
+            out_vol[i] = abs(out_chg_pct[i])
+            out_vpt[i] = av[i] / (nt[i] + 1)
+            out_vpr[i] = av[i] / op[i]
+
 
 class CryptoMLAnalyzer:
     """
     Main class for cryptocurrency machine learning analysis
     """
     
+    # Filename keywords mapped to dataset categories, in priority order
+    _CATEGORY_KEYWORDS = {
+        'bitcoin': 'bitcoin',
+        'btc': 'bitcoin',
+        'ethereum': 'ethereum',
+        'eth': 'ethereum',
+        'defi': 'defi',
+        'meme': 'meme',
+        'altcoin': 'altcoin'
+    }
+    # Lookahead so overlapping keywords (e.g. 'memethereum') are all reported
+    _CATEGORY_RE = re.compile('(?=(' + '|'.join(_CATEGORY_KEYWORDS) + '))', re.IGNORECASE)
+    
+    # Insert statements reused for every batch on the persistent connection
+    _INSERT_FILE_SQL = '''
+        INSERT INTO file_analysis 
+        (filename, file_path, records_count, date_range_start, date_range_end, 
+         price_range_min, price_range_max, avg_volume, avg_trades)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    
+    _INSERT_MODEL_SQL = '''
+        INSERT INTO ml_model_results 
+        (model_name, dataset_name, train_score, validation_score, test_score, 
+         mse, mae, feature_names_json, feature_importances, prediction_accuracy)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    
+    _INSERT_PREDICTION_SQL = '''
+        INSERT INTO predictions 
+        (model_name, date, predicted_price, confidence_interval)
+        VALUES (?, ?, ?, ?)
+    '''
+    
     def __init__(self, data_dir="data/multi_files", db_path="crypto_ml_results.db"):
         """
         Initialize the analyzer
@@ -81,14 +275,22 @@ class CryptoMLAnalyzer:
         self.scalers = {}
         self.feature_names = []
         self.results = {}
+        self._cat_cache = {}
+        self._file_stats = {}
+        
+        # Single connection for the whole analysis run; transactions are
+        # managed explicitly with BEGIN/COMMIT so each batch is one fsync
+        self._conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        for pragma in ('journal_mode=WAL', 'synchronous=NORMAL', 'busy_timeout=5000',
+                       'temp_store=MEMORY', 'cache_size=-65536'):
+            self._conn.execute(f'PRAGMA {pragma}')
         
         # Initialize database
         self._init_database()
     
     def _init_database(self):
         """Initialize SQLite database for storing results"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._conn.cursor()
         
         # Create tables for storing analysis results
         cursor.execute('''
@@ -117,12 +319,20 @@ class CryptoMLAnalyzer:
                 test_score REAL,
                 mse REAL,
                 mae REAL,
-                feature_importance TEXT,
+                feature_names_json TEXT,
+                feature_importances BLOB,
                 prediction_accuracy REAL,
                 analysis_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
         
+        # Databases created before feature importances were stored as
+        # names + float32 BLOB only have the legacy JSON column
+        existing_cols = {row[1] for row in cursor.execute('PRAGMA table_info(ml_model_results)')}
+        for col, col_type in (('feature_names_json', 'TEXT'), ('feature_importances', 'BLOB')):
+            if col not in existing_cols:
+                cursor.execute(f'ALTER TABLE ml_model_results ADD COLUMN {col} {col_type}')
+        
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS predictions (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -134,9 +344,23 @@ class CryptoMLAnalyzer:
                 analysis_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
-        
-        conn.commit()
-        conn.close()
+    
+    def _executemany(self, sql, rows):
+        """Insert a batch of rows in a single transaction on the shared connection"""
+        cursor = self._conn.cursor()
+        cursor.execute("BEGIN")
+        try:
+            cursor.executemany(sql, rows)
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        cursor.execute("COMMIT")
+    
+    def close(self):
+        """Close the database connection"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
     
     def discover_files(self):
         """
@@ -158,36 +382,26 @@ class CryptoMLAnalyzer:
             print(f"❌ No CSV files found in {self.data_dir}")
             return {}
         
-        for file_path in csv_files:
-            try:
-                # Read first few rows to understand the data
-                df_sample = pd.read_csv(file_path, nrows=5)
-                
-                # Validate expected columns
-                required_cols = ['date', 'open_time', 'close_time', 'open_price', 'close_price', 'asset_volume', 'number_of_trades']
-                if not all(col in df_sample.columns for col in required_cols):
-                    print(f"⚠️  Skipping {file_path.name}: Missing required columns")
+        # Files are independent, so parse them in parallel worker processes
+        max_workers = min(len(csv_files), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_load_one, file_path) for file_path in csv_files]
+            
+            for file_path, future in zip(csv_files, futures):
+                try:
+                    name, metadata, stats, df_full = future.result()
+                except (ValueError, KeyError) as e:
+                    print(f"⚠️  Skipping {file_path.name}: Missing required columns ({e})")
+                    continue
+                except Exception as e:
+                    print(f"❌ Error reading {file_path.name}: {e}")
                     continue
                 
-                # Get file metadata
-                df_full = pd.read_csv(file_path)
-                metadata = {
-                    'path': str(file_path),
-                    'name': file_path.stem,
-                    'records': len(df_full),
-                    'columns': list(df_full.columns),
-                    'date_range': (df_full['date'].min(), df_full['date'].max()),
-                    'price_range': (df_full['open_price'].min(), df_full['close_price'].max()),
-                    'size_mb': file_path.stat().st_size / (1024 * 1024)
-                }
-                
-                discovered_files[file_path.name] = metadata
-                self.files_data[file_path.name] = df_full
-                
-                print(f"✅ {file_path.name}: {metadata['records']} records, {metadata['size_mb']:.2f}MB")
+                discovered_files[name] = metadata
+                self.files_data[name] = df_full
+                self._file_stats[name] = stats
                 
-            except Exception as e:
-                print(f"❌ Error reading {file_path.name}: {e}")
+                print(f"✅ {name}: {metadata['records']} records, {metadata['size_mb']:.2f}MB")
         
         print(f"\n📊 Total files discovered: {len(discovered_files)}")
         return discovered_files
@@ -205,27 +419,49 @@ class CryptoMLAnalyzer:
             print("❌ No data files loaded. Run discover_files() first.")
             return None
         
-        all_data = []
+        # Consolidate all data by filling preallocated column arrays slice by slice,
+        # avoiding a per-file copy followed by a second copy in pd.concat
+        filenames = list(self.files_data)
+        lengths = [len(df) for df in self.files_data.values()]
+        total_rows = sum(lengths)
+        
+        columns = {}
+        for col in REQUIRED_COLUMNS:
+            chunks = [df[col].to_numpy() for df in self.files_data.values()]
+            values = np.empty(total_rows, dtype=np.result_type(*chunks))
+            offset = 0
+            for chunk in chunks:
+                values[offset:offset + len(chunk)] = chunk
+                offset += len(chunk)
+            columns[col] = values
+        
+        # Add source file information as categoricals (one small integer code per row)
+        columns['source_file'] = pd.Categorical.from_codes(
+            np.repeat(np.arange(len(filenames)), lengths), categories=filenames
+        )
+        columns['dataset_category'] = pd.Categorical(
+            np.repeat(np.array([self._categorize_file(filename) for filename in filenames], dtype=object), lengths)
+        )
         
-        for filename, df in self.files_data.items():
-            # Add source file information
-            df_copy = df.copy()
-            df_copy['source_file'] = filename
-            df_copy['dataset_category'] = self._categorize_file(filename)
-            
-            # Convert date and time columns
-            df_copy['datetime'] = pd.to_datetime(df_copy['date'] + ' ' + df_copy['open_time'])
-            df_copy['date'] = pd.to_datetime(df_copy['date'])
-            
-            all_data.append(df_copy)
+        consolidated = pd.DataFrame(columns)
+        
+        # Convert date and time columns; parse the date once with an explicit format
+        # and add the open time as a timedelta instead of concatenating strings
+        consolidated['date'] = pd.to_datetime(consolidated['date'], format='%Y-%m-%d', cache=True)
+        consolidated['datetime'] = consolidated['date'] + pd.to_timedelta(consolidated['open_time'])
         
-        # Consolidate all data
-        consolidated = pd.concat(all_data, ignore_index=True)
         consolidated = consolidated.sort_values('datetime').reset_index(drop=True)
         
         # Feature engineering
         consolidated = self._engineer_features(consolidated)
         
+        # Downcast features to halve memory traffic through scaling and training;
+        # the target keeps full precision for the error metrics
+        for col in consolidated.select_dtypes('float64').columns.drop('next_close_price'):
+            consolidated[col] = consolidated[col].astype(np.float32, copy=False)
+        for col in consolidated.select_dtypes('int64').columns:
+            consolidated[col] = pd.to_numeric(consolidated[col], downcast='integer')
+        
         self.consolidated_data = consolidated
         print(f"✅ Consolidated dataset: {len(consolidated)} total records")
         
@@ -235,20 +471,24 @@ class CryptoMLAnalyzer:
         return consolidated
     
     def _categorize_file(self, filename):
-        """Categorize file based on name patterns"""
-        filename_lower = filename.lower()
-        if 'bitcoin' in filename_lower or 'btc' in filename_lower:
-            return 'bitcoin'
-        elif 'ethereum' in filename_lower or 'eth' in filename_lower:
-            return 'ethereum'
-        elif 'defi' in filename_lower:
-            return 'defi'
-        elif 'meme' in filename_lower:
-            return 'meme'
-        elif 'altcoin' in filename_lower:
-            return 'altcoin'
-        else:
-            return 'other'
+        """Categorize file based on name patterns (memoized per filename)"""
+        category = self._cat_cache.get(filename)
+        if category is None:
+            # Scan the name once, then resolve overlapping keywords by priority
+            found = {match.lower() for match in self._CATEGORY_RE.findall(filename)}
+            category = next(
+                (cat for keyword, cat in self._CATEGORY_KEYWORDS.items() if keyword in found),
+                'other'
+            )
+            self._cat_cache[filename] = category
+        return category
+    
+    def _get_file_stats(self, filename):
+        """Return cached summary statistics for a loaded file, computing them if needed"""
+        stats = self._file_stats.get(filename)
+        if stats is None:
+            stats = self._file_stats[filename] = _summarize_frame(self.files_data[filename])
+        return stats
     
     def _engineer_features(self, df):
         """
@@ -262,35 +502,58 @@ class CryptoMLAnalyzer:
         """
         print("🔧 Engineering features...")
         
-        # Price-based features
-        df['price_change'] = df['close_price'] - df['open_price']
-        df['price_change_pct'] = (df['price_change'] / df['open_price']) * 100
-        df['volatility'] = np.abs(df['price_change_pct'])
-        
-        # Volume-based features
-        df['volume_per_trade'] = df['asset_volume'] / (df['number_of_trades'] + 1)
-        df['volume_price_ratio'] = df['asset_volume'] / df['open_price']
+        if NUMBA_AVAILABLE:
+            # Price and volume features fused into one pass over contiguous arrays
+            inputs = [
+                np.ascontiguousarray(df[col].to_numpy(dtype=np.float64))
+                for col in ('open_price', 'close_price', 'asset_volume', 'number_of_trades')
+            ]
+            outputs = {
+                col: np.empty(len(df), dtype=np.float64)
+                for col in ('price_change', 'price_change_pct', 'volatility', 'volume_per_trade', 'volume_price_ratio')
+            }
+            _engineer_kernel(*inputs, *outputs.values())
+            for col, values in outputs.items():
+                df[col] = values
+        else:
+            # Price-based features
+            df['price_change'] = df['close_price'] - df['open_price']
+            df['price_change_pct'] = (df['price_change'] / df['open_price']) * 100
+            df['volatility'] = np.abs(df['price_change_pct'])
+            
+            # Volume-based features
+            df['volume_per_trade'] = df['asset_volume'] / (df['number_of_trades'] + 1)
+            df['volume_price_ratio'] = df['asset_volume'] / df['open_price']
         
         # Time-based features
         df['hour'] = df['datetime'].dt.hour
         df['day_of_week'] = df['datetime'].dt.dayofweek
         df['day_of_month'] = df['datetime'].dt.day
         
+        # Build the per-file grouping once and roll/shift price and volume together
+        by_file = df.groupby('source_file', sort=False, observed=True)[['close_price', 'asset_volume']]
+        
         # Technical indicators (simple moving averages)
         for window in [3, 5, 10]:
-            df[f'sma_{window}'] = df.groupby('source_file')['close_price'].rolling(window=window).mean().reset_index(0, drop=True)
-            df[f'volume_sma_{window}'] = df.groupby('source_file')['asset_volume'].rolling(window=window).mean().reset_index(0, drop=True)
+            sma = by_file.rolling(window=window).mean().droplevel(0)
+            df[f'sma_{window}'] = sma['close_price']
+            df[f'volume_sma_{window}'] = sma['asset_volume']
         
         # Lag features
         for lag in [1, 2, 3]:
-            df[f'price_lag_{lag}'] = df.groupby('source_file')['close_price'].shift(lag)
-            df[f'volume_lag_{lag}'] = df.groupby('source_file')['asset_volume'].shift(lag)
+            lagged = by_file.shift(lag)
+            df[f'price_lag_{lag}'] = lagged['close_price']
+            df[f'volume_lag_{lag}'] = lagged['asset_volume']
         
         # Forward-looking target (price prediction)
-        df['next_close_price'] = df.groupby('source_file')['close_price'].shift(-1)
+        df['next_close_price'] = by_file.shift(-1)['close_price']
         
-        # Drop rows with NaN values
-        df = df.dropna().reset_index(drop=True)
+        # Drop rows with NaN values in one masked selection. Only float columns can
+        # hold NaN here (rolling/lag warm-up rows, the shifted target, gaps in raw
+        # prices/volumes); integer time features and label columns are not scanned
+        float_cols = df.select_dtypes(include=np.floating).columns
+        df = df.loc[df[float_cols].notna().all(axis=1)]
+        df.index = pd.RangeIndex(len(df))
         
         print(f"✅ Feature engineering complete. Dataset shape: {df.shape}")
         return df
@@ -356,80 +619,122 @@ class CryptoMLAnalyzer:
             print("❌ Machine learning libraries not available!")
             return {}
         
-        # Scale features
-        scaler = StandardScaler()
-        X_train_scaled = scaler.fit_transform(X_train)
-        X_val_scaled = scaler.transform(X_val)
-        X_test_scaled = scaler.transform(X_test)
-        
-        self.scalers['standard'] = scaler
-        
         # Define models to train
         models_to_train = {
-            'Random Forest': RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=-1),
-            'Gradient Boosting': GradientBoostingRegressor(n_estimators=100, random_state=42),
-            'Linear Regression': LinearRegression(),
-            'Ridge Regression': Ridge(alpha=1.0, random_state=42)
+            'HistGB': HistGradientBoostingRegressor(
+                max_iter=200, max_bins=255, early_stopping=True, validation_fraction=0.1, random_state=42
+            )
         }
+        if LIGHTGBM_AVAILABLE:
+            models_to_train['LightGBM'] = LGBMRegressor(n_estimators=200, num_leaves=63, n_jobs=2, random_state=42, verbose=-1)
+        else:
+            models_to_train['Gradient Boosting'] = GradientBoostingRegressor(n_estimators=100, random_state=42)
+        models_to_train['Linear Regression'] = LinearRegression()
+        models_to_train['Ridge Regression'] = Ridge(alpha=1.0, random_state=42)
+        
+        # Convert once to C-contiguous float32 arrays so every model skips
+        # sklearn's per-fit validate-and-copy; targets keep full precision
+        raw_sets = tuple(np.ascontiguousarray(X.to_numpy(dtype=np.float32)) for X in (X_train, X_val, X_test))
+        y_train, y_val, y_test = (np.ascontiguousarray(y.to_numpy(dtype=np.float64)) for y in (y_train, y_val, y_test))
+        
+        # Linear models are fitted on scaled features, tree models on raw ones
+        scaled_sets = None
+        
+        # Scale features once, and only if a linear model will use them
+        if any('Linear' in name or 'Ridge' in name for name in models_to_train):
+            X_train_np, X_val_np, X_test_np = raw_sets
+            scaler = StandardScaler()
+            scaled_sets = (
+                scaler.fit_transform(X_train_np),
+                scaler.transform(X_val_np),
+                scaler.transform(X_test_np)
+            )
+            
+            self.scalers['standard'] = scaler
+        
+        for name in models_to_train:
+            print(f"🔄 Training {name}...")
+        
+        # Fit all models concurrently; sklearn/LightGBM release the GIL while fitting
+        fitted = Parallel(n_jobs=len(models_to_train), backend='threading')(
+            delayed(self._fit_one)(
+                name, model,
+                *(scaled_sets if 'Linear' in name or 'Ridge' in name else raw_sets),
+                y_train, y_val, y_test
+            )
+            for name, model in models_to_train.items()
+        )
         
         results = {}
         
-        for name, model in models_to_train.items():
-            print(f"🔄 Training {name}...")
+        for name, model_results, error in fitted:
+            if error is not None:
+                print(f"   ❌ Error training {name}: {error}")
+                continue
             
-            try:
-                # Train model
-                if 'Linear' in name or 'Ridge' in name:
-                    model.fit(X_train_scaled, y_train)
-                    train_pred = model.predict(X_train_scaled)
-                    val_pred = model.predict(X_val_scaled)
-                    test_pred = model.predict(X_test_scaled)
-                else:
-                    model.fit(X_train, y_train)
-                    train_pred = model.predict(X_train)
-                    val_pred = model.predict(X_val)
-                    test_pred = model.predict(X_test)
-                
-                # Calculate metrics
-                train_score = r2_score(y_train, train_pred)
-                val_score = r2_score(y_val, val_pred)
-                test_score = r2_score(y_test, test_pred)
-                
-                mse = mean_squared_error(y_test, test_pred)
-                mae = mean_absolute_error(y_test, test_pred)
-                
-                # Feature importance (for tree-based models)
-                feature_importance = None
-                if hasattr(model, 'feature_importances_'):
-                    importance_dict = dict(zip(self.feature_names, model.feature_importances_))
-                    feature_importance = sorted(importance_dict.items(), key=lambda x: x[1], reverse=True)[:10]
-                
-                # Store results
-                model_results = {
-                    'model': model,
-                    'train_score': train_score,
-                    'val_score': val_score,
-                    'test_score': test_score,
-                    'mse': mse,
-                    'mae': mae,
-                    'feature_importance': feature_importance,
-                    'predictions': test_pred
-                }
-                
-                results[name] = model_results
-                self.models[name] = model
-                
-                print(f"   ✅ {name}: R² = {test_score:.4f}, MSE = {mse:.2f}, MAE = {mae:.2f}")
-                
-                # Store in database
-                self._store_model_results(name, model_results)
-                
-            except Exception as e:
-                print(f"   ❌ Error training {name}: {e}")
+            results[name] = model_results
+            self.models[name] = model_results['model']
+            
+            print(f"   ✅ {name}: R² = {model_results['test_score']:.4f}, MSE = {model_results['mse']:.2f}, MAE = {model_results['mae']:.2f}")
+        
+        # Store all model results in database in a single transaction
+        if results:
+            self._store_model_results(results)
         
         self.results = results
         return results
     
+    def _fit_one(self, name, model, X_train, X_val, X_test, y_train, y_val, y_test):
+        """
+        Fit a single model and evaluate it on all three splits
+        
+        Args:
+            name (str): Model name
+            model: Unfitted estimator
+            X_train, X_val, X_test: Feature matrices (already scaled if needed)
+            y_train, y_val, y_test: Target vectors
+            
+        Returns:
+            tuple: (name, model_results, error) where error is None on success
+        """
+        try:
+            # Train model
+            model.fit(X_train, y_train)
+            train_pred = model.predict(X_train)
+            val_pred = model.predict(X_val)
+            test_pred = model.predict(X_test)
+            
+            # Calculate metrics
+            train_score = r2_score(y_train, train_pred)
+            val_score = r2_score(y_val, val_pred)
+            test_score = r2_score(y_test, test_pred)
+            
+            mse = mean_squared_error(y_test, test_pred)
+            mae = mean_absolute_error(y_test, test_pred)
+            
+            # Feature importance (for tree-based models)
+            feature_importance = None
+            if hasattr(model, 'feature_importances_'):
+                importance_dict = dict(zip(self.feature_names, map(float, model.feature_importances_)))
+                feature_importance = sorted(importance_dict.items(), key=lambda x: x[1], reverse=True)[:10]
+            
+            # Store results
+            model_results = {
+                'model': model,
+                'train_score': train_score,
+                'val_score': val_score,
+                'test_score': test_score,
+                'mse': mse,
+                'mae': mae,
+                'feature_importance': feature_importance,
+                'predictions': test_pred
+            }
+            
+            return name, model_results, None
+            
+        except Exception as e:
+            return name, None, e
+    
     def generate_predictions(self, n_future_days=7):
         """
         Generate future price predictions
@@ -447,7 +752,7 @@ class CryptoMLAnalyzer:
             return {}
         
         # Use the best performing model
-        best_model_name = max(self.results.keys(), key=lambda x: self.results[x]['test_score'])
+        best_model_name = max(self.results.items(), key=lambda kv: kv[1]['test_score'])[0]
         best_model = self.models[best_model_name]
         
         print(f"🏆 Using best model: {best_model_name}")
@@ -459,7 +764,7 @@ class CryptoMLAnalyzer:
         
         # Simple prediction using the last known features
         # In a real scenario, you'd need to engineer features for future dates
-        last_features = recent_data[self.feature_names].iloc[-1:].values
+        last_features = recent_data[self.feature_names].iloc[-1:].to_numpy(dtype=np.float32)
         
         if 'Linear' in best_model_name or 'Ridge' in best_model_name:
             last_features_scaled = self.scalers['standard'].transform(last_features)
@@ -480,77 +785,60 @@ class CryptoMLAnalyzer:
     
     def _store_file_analysis(self):
         """Store file analysis results in database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+        rows = []
         for filename, df in self.files_data.items():
-            cursor.execute('''
-                INSERT INTO file_analysis 
-                (filename, file_path, records_count, date_range_start, date_range_end, 
-                 price_range_min, price_range_max, avg_volume, avg_trades)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            stats = self._get_file_stats(filename)
+            rows.append((
                 filename,
                 str(Path(self.data_dir) / filename),
                 len(df),
-                df['date'].min(),
-                df['date'].max(),
-                float(df['open_price'].min()),
-                float(df['close_price'].max()),
-                float(df['asset_volume'].mean()),
-                int(df['number_of_trades'].mean())
+                stats['date_min'],
+                stats['date_max'],
+                float(stats['price_min']),
+                float(stats['price_max']),
+                float(stats['avg_volume']),
+                int(stats['avg_trades'])
             ))
         
-        conn.commit()
-        conn.close()
+        self._executemany(self._INSERT_FILE_SQL, rows)
     
-    def _store_model_results(self, model_name, results):
-        """Store model results in database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        feature_importance_json = json.dumps(results['feature_importance']) if results['feature_importance'] else None
-        
-        cursor.execute('''
-            INSERT INTO ml_model_results 
-            (model_name, dataset_name, train_score, validation_score, test_score, 
-             mse, mae, feature_importance, prediction_accuracy)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            model_name,
-            'consolidated_crypto_data',
-            results['train_score'],
-            results['val_score'],
-            results['test_score'],
-            results['mse'],
-            results['mae'],
-            feature_importance_json,
-            results['test_score']
-        ))
+    def _store_model_results(self, results):
+        """Store results for all trained models in database"""
+        rows = []
+        for model_name, model_results in results.items():
+            # Names as JSON, values as a packed float32 array (decode with decode_feature_importance)
+            feature_names_json = None
+            feature_importances = None
+            if model_results['feature_importance']:
+                names, values = zip(*model_results['feature_importance'])
+                feature_names_json = json.dumps(names)
+                feature_importances = np.asarray(values, dtype=np.float32).tobytes()
+            rows.append((
+                model_name,
+                'consolidated_crypto_data',
+                model_results['train_score'],
+                model_results['val_score'],
+                model_results['test_score'],
+                model_results['mse'],
+                model_results['mae'],
+                feature_names_json,
+                feature_importances,
+                model_results['test_score']
+            ))
         
-        conn.commit()
-        conn.close()
+        self._executemany(self._INSERT_MODEL_SQL, rows)
     
     def _store_predictions(self, model_name, predicted_price, confidence):
         """Store predictions in database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         future_date = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
         
-        cursor.execute('''
-            INSERT INTO predictions 
-            (model_name, date, predicted_price, confidence_interval)
-            VALUES (?, ?, ?, ?)
-        ''', (
+        # A single statement on the autocommit connection is its own transaction
+        self._conn.execute(self._INSERT_PREDICTION_SQL, (
             model_name,
             future_date,
             float(predicted_price),
             float(confidence)
         ))
-        
-        conn.commit()
-        conn.close()
     
     def print_analysis_summary(self):
         """Print comprehensive analysis summary"""
@@ -562,13 +850,14 @@ class CryptoMLAnalyzer:
         print(f"\n📁 DATA SOURCES ({len(self.files_data)} files):")
         for filename, df in self.files_data.items():
             category = self._categorize_file(filename)
+            stats = self._get_file_stats(filename)
             print(f"   📊 {filename}")
             print(f"       Category: {category.upper()}")
             print(f"       Records: {len(df):,}")
-            print(f"       Date Range: {df['date'].min()} to {df['date'].max()}")
-            print(f"       Price Range: ${df['open_price'].min():.2f} - ${df['close_price'].max():.2f}")
-            print(f"       Avg Volume: {df['asset_volume'].mean():.2f}")
-            print(f"       Avg Trades: {df['number_of_trades'].mean():.0f}")
+            print(f"       Date Range: {stats['date_min']} to {stats['date_max']}")
+            print(f"       Price Range: ${stats['price_min']:.2f} - ${stats['price_max']:.2f}")
+            print(f"       Avg Volume: {stats['avg_volume']:.2f}")
+            print(f"       Avg Trades: {stats['avg_trades']:.0f}")
             print()
         
         # Model performance
@@ -577,12 +866,13 @@ class CryptoMLAnalyzer:
             print(f"{'Model':<20} {'R² Score':<12} {'MSE':<12} {'MAE':<12} {'Status'}")
             print("-" * 70)
             
+            best_model = max(self.results.items(), key=lambda kv: kv[1]['test_score'])[0]
+            
             for name, results in self.results.items():
-                status = "🏆 Best" if name == max(self.results.keys(), key=lambda x: self.results[x]['test_score']) else "✅ Good"
+                status = "🏆 Best" if name == best_model else "✅ Good"
                 print(f"{name:<20} {results['test_score']:<12.4f} {results['mse']:<12.2f} {results['mae']:<12.2f} {status}")
             
             # Feature importance for best model
-            best_model = max(self.results.keys(), key=lambda x: self.results[x]['test_score'])
             if self.results[best_model]['feature_importance']:
                 print(f"\n🎯 TOP FEATURES ({best_model}):")
                 for feature, importance in self.results[best_model]['feature_importance'][:5]:
@@ -601,8 +891,6 @@ class CryptoMLAnalyzer:
         Returns:
             pd.DataFrame: Query results
         """
-        conn = sqlite3.connect(self.db_path)
-        
         if query_type == "summary":
             query = """
             SELECT 
@@ -647,10 +935,7 @@ class CryptoMLAnalyzer:
         else:
             query = "SELECT name FROM sqlite_master WHERE type='table';"
         
-        result = pd.read_sql_query(query, conn)
-        conn.close()
-        
-        return result
+        return pd.read_sql_query(query, self._conn)
 
 
 def main():
@@ -715,6 +1000,7 @@ Examples:
     if args.query:
         print(f"🔍 Querying {args.query} results...")
         results = analyzer.query_results(args.query)
+        analyzer.close()
         print(results.to_string(index=False))
         return
     
@@ -765,6 +1051,8 @@ Examples:
         print(f"\n❌ Error during analysis: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        analyzer.close()
 
 
 if __name__ == "__main__":
@@ -24,7 +24,7 @@ try:
 except ImportError as e:
     print(f"❌ Error importing analyzer: {e}")
     print("Installing required dependencies...")
-    os.system("pip install pandas numpy scikit-learn matplotlib seaborn")
+    os.system("pip install pandas numpy scikit-learn")
     
     try:
         from crypto_ml_analyzer import main